@@ -21,14 +21,25 @@ Convention: plugins declare dependencies in .claude-plugin/deps.json:
 Legacy: also reads "dependencies" from plugin.json as a fallback.
 """
 
+import functools
 import json
+import operator
+import os
 import re
 import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
 
+try:
+    import orjson  # optional: faster JSON parsing and serialization
+except ImportError:
+    orjson = None
+
 PLUGINS_DIR = Path.home() / ".claude" / "plugins"
 INSTALLED_FILE = PLUGINS_DIR / "installed_plugins.json"
 MARKETPLACES_FILE = PLUGINS_DIR / "known_marketplaces.json"
+CACHE_FILE = PLUGINS_DIR / ".resolve-deps-cache.json"
 
 
 # ---------------------------------------------------------------------------
@@ -44,6 +55,7 @@ _SEMVER_RE = re.compile(
 )
 
 
+@functools.lru_cache(maxsize=1024)
 def parse_version(v):
     """Parse a semver string into (major, minor, patch, pre) tuple.
 
@@ -65,9 +77,41 @@ def parse_version(v):
     return (major, minor, patch, pre)
 
 
+# Release versions pack into one int: (major << 40) | (minor << 20) | patch.
+_PACK_SHIFT = 20
+_PACK_MASK = (1 << _PACK_SHIFT) - 1
+
+
+def pack_version(parsed):
+    """Pack a release version into an int that sorts like its tuple key.
+
+    Returns None for pre-releases and for minor/patch values too large to
+    pack; those keep the tuple form.
+    """
+    major, minor, patch, pre = parsed
+    if pre is not None or minor > _PACK_MASK or patch > _PACK_MASK:
+        return None
+    return (major << (2 * _PACK_SHIFT)) | (minor << _PACK_SHIFT) | patch
+
+
+@functools.lru_cache(maxsize=1024)
 def _version_key(parsed):
     """Return a sort key for a parsed version tuple.
 
+    Release versions get a packed int (see pack_version) so the common
+    comparison is a single int compare. Other versions get the tuple key
+    from _tuple_version_key(); compare via _as_tuple_key() when the kinds
+    may be mixed.
+    """
+    packed = pack_version(parsed)
+    if packed is not None:
+        return packed
+    return _tuple_version_key(parsed)
+
+
+def _tuple_version_key(parsed):
+    """Return the tuple sort key for a parsed version tuple.
+
     Semver: 1.0.0-alpha < 1.0.0-alpha.1 < 1.0.0-beta < 1.0.0
     We achieve this by sorting (major, minor, patch, pre_sort_key) where
     no pre-release gets a high sentinel value.
@@ -87,30 +131,19 @@ def _version_key(parsed):
         return (major, minor, patch, (0,) + tuple(normalized))
 
 
-def version_cmp(a, b):
-    """Compare two parsed versions. Returns -1, 0, or 1."""
-    ka, kb = _version_key(a), _version_key(b)
-    return (ka > kb) - (ka < kb)
-
-
-def version_gte(a, b):
-    return version_cmp(a, b) >= 0
-
+def _as_tuple_key(key):
+    """Expand a packed int key to its tuple form; tuple keys pass through."""
+    if type(key) is int:
+        shift = _PACK_SHIFT
+        return (key >> (2 * shift), (key >> shift) & _PACK_MASK, key & _PACK_MASK, (1,))
+    return key
 
-def version_lte(a, b):
-    return version_cmp(a, b) <= 0
 
-
-def version_gt(a, b):
-    return version_cmp(a, b) > 0
-
-
-def version_lt(a, b):
-    return version_cmp(a, b) < 0
-
-
-def version_eq(a, b):
-    return version_cmp(a, b) == 0
+@functools.lru_cache(maxsize=1024)
+def parse_version_key(v):
+    """Parse a semver string straight to its sort key, or None if invalid."""
+    parsed = parse_version(v)
+    return None if parsed is None else _version_key(parsed)
 
 
 # ---------------------------------------------------------------------------
@@ -121,9 +154,15 @@ _CONSTRAINT_RE = re.compile(
     r"(?P<op>[>=<^~!]*)\s*(?P<ver>v?(?:0|[1-9]\d*)\.(?:0|[1-9]\d*)\.(?:0|[1-9]\d*)(?:-[0-9A-Za-z\-.]+)?(?:\+[0-9A-Za-z\-.]+)?)"
 )
 
+# Splits a spec into constraint tokens on whitespace, except whitespace that
+# directly follows an operator (">= 1.0.0" stays one token). Matching each
+# token in full keeps the work linear in the length of the spec.
+_CONSTRAINT_SPLIT_RE = re.compile(r"(?<![>=<^~!\s])\s+")
+
 
+@functools.lru_cache(maxsize=1024)
 def parse_constraint(spec):
-    """Parse a version constraint string into a list of (op, parsed_version).
+    """Parse a version constraint string into a tuple of (op, parsed_version).
 
     Supports:
       "1.2.3"          → exact match (=1.2.3)
@@ -135,12 +174,20 @@ def parse_constraint(spec):
       "^1.2.3"         → compatible (>=1.2.3, <2.0.0; ^0.2.3 → >=0.2.3, <0.3.0)
       "~1.2.3"         → approximate (>=1.2.3, <1.3.0)
       ">=1.0.0 <2.0.0" → space-separated AND of constraints
+      ">=1.0.0, <2.0.0" → unparsable (every token must be a constraint)
+
+    Results are memoized, so the return value is an immutable tuple.
     """
     if not spec or not spec.strip():
-        return []
+        return ()
 
     constraints = []
-    for m in _CONSTRAINT_RE.finditer(spec):
+    for token in _CONSTRAINT_SPLIT_RE.split(spec.strip()):
+        m = _CONSTRAINT_RE.fullmatch(token)
+        if not m:
+            # One bad token makes the whole spec unparsable rather than
+            # silently dropping part of the constraint
+            return ()
         op = m.group("op") or "="
         ver = parse_version(m.group("ver"))
         if ver is None:
@@ -175,7 +222,46 @@ def parse_constraint(spec):
             # Unknown op, treat as exact
             constraints.append(("=", ver))
 
-    return constraints
+    return tuple(constraints)
+
+
+_CONSTRAINT_OPS = {
+    "=": operator.eq,
+    ">=": operator.ge,
+    ">": operator.gt,
+    "<=": operator.le,
+    "<": operator.lt,
+    "!=": operator.ne,
+}
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_constraint(spec):
+    """Compile a constraint spec into a predicate over version sort keys.
+
+    Target keys are computed once per spec, so checking a version costs one
+    key comparison per constraint: a plain int compare when both sides are
+    packed release keys. Returns None if spec has no parsable constraints.
+    """
+    constraints = parse_constraint(spec)
+    if not constraints:
+        return None
+    comparisons = tuple((_CONSTRAINT_OPS[op], _version_key(target)) for op, target in constraints)
+    tuple_comparisons = tuple((cmp, _as_tuple_key(tk)) for cmp, tk in comparisons)
+
+    def check_tuple(key):
+        key = _as_tuple_key(key)
+        return all(cmp(key, tk) for cmp, tk in tuple_comparisons)
+
+    if any(type(tk) is not int for _, tk in comparisons):
+        return check_tuple
+
+    def check(key):
+        if type(key) is int:
+            return all(cmp(key, tk) for cmp, tk in comparisons)
+        return check_tuple(key)
+
+    return check
 
 
 def satisfies(version_str, constraint_spec):
@@ -187,26 +273,19 @@ def satisfies(version_str, constraint_spec):
     if not constraint_spec or not constraint_spec.strip():
         return True, ""
 
-    ver = parse_version(version_str)
-    if ver is None:
+    installed_key = parse_version_key(version_str)
+    if installed_key is None:
         return False, f"cannot parse version '{version_str}'"
 
-    constraints = parse_constraint(constraint_spec)
-    if not constraints:
+    predicate = compile_constraint(constraint_spec)
+    if predicate is None:
         return False, f"cannot parse constraint '{constraint_spec}'"
+    if predicate(installed_key):
+        return True, ""
 
-    ops = {
-        "=": version_eq,
-        ">=": version_gte,
-        ">": version_gt,
-        "<=": version_lte,
-        "<": version_lt,
-        "!=": lambda a, b: not version_eq(a, b),
-    }
-
-    for op, target in constraints:
-        fn = ops.get(op)
-        if fn and not fn(ver, target):
+    # Slow path: find the first failing constraint to report it
+    for op, target in parse_constraint(constraint_spec):
+        if not _CONSTRAINT_OPS[op](_as_tuple_key(installed_key), _as_tuple_key(_version_key(target))):
             tv = format_version(target)
             return False, f"installed {version_str} does not satisfy {op}{tv}"
 
@@ -226,33 +305,128 @@ def format_version(parsed):
 # Plugin discovery
 # ---------------------------------------------------------------------------
 
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
 def load_json(path):
     try:
-        with open(path) as f:
-            return json.load(f)
+        with open(path, "rb") as f:
+            return _json_loads(f.read())
     except (FileNotFoundError, json.JSONDecodeError):
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
         return {}
 
 
+# ---------------------------------------------------------------------------
+# Dependency declaration cache
+# ---------------------------------------------------------------------------
+
+# install_path -> {"source", "mtime_ns", "size", "has_deps"[, "deps"]},
+# persisted to CACHE_FILE between runs. "source" names the file the
+# declarations came from (deps.json or plugin.json); an entry is reused only
+# while that file's mtime and size are unchanged. Plugins without
+# dependencies are recorded as has_deps=False with no payload.
+_file_cache = {}
+_file_cache_used = {}  # entries looked up or refreshed during this run
+_file_cache_enabled = False
+
+
+def load_file_cache():
+    """Load the on-disk dependency cache and enable lookups."""
+    global _file_cache_enabled
+    data = load_json(CACHE_FILE)
+    _file_cache.clear()
+    _file_cache.update(data if isinstance(data, dict) else {})
+    _file_cache_used.clear()
+    _file_cache_enabled = True
+
+
+def save_file_cache():
+    """Atomically write back the entries used this run, if anything changed.
+
+    Entries for plugins not seen this run are dropped, so uninstalled plugins
+    don't accumulate. Write failures are ignored; the cache is an optimization.
+    """
+    if not _file_cache_enabled or _file_cache_used == _file_cache:
+        return
+    tmp = CACHE_FILE.with_name(CACHE_FILE.name + ".tmp")
+    try:
+        with open(tmp, "w") as f:
+            json.dump(_file_cache_used, f)
+        os.replace(tmp, CACHE_FILE)
+    except OSError:
+        pass
+
+
+def _file_validator(path):
+    """Return (mtime_ns, size) for path, or (None, None) if it can't be stat'ed."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None, None
+    return st.st_mtime_ns, st.st_size
+
+
+def cached_plugin_deps(install_path, source, mtime_ns, size):
+    """Return cached dependencies for install_path, or None on a miss."""
+    if not _file_cache_enabled:
+        return None
+    entry = _file_cache.get(install_path)
+    if (
+        not isinstance(entry, dict)
+        or entry.get("source") != source
+        or entry.get("mtime_ns") != mtime_ns
+        or entry.get("size") != size
+    ):
+        return None
+    deps = entry.get("deps") if entry.get("has_deps") else {}
+    if not isinstance(deps, dict):
+        # Malformed entry: treat as a miss so the file is re-read
+        return None
+    _file_cache_used[install_path] = entry
+    return deps
+
+
+def store_plugin_deps(install_path, source, mtime_ns, size, deps):
+    """Record freshly read dependencies for install_path in the cache."""
+    if not _file_cache_enabled:
+        return
+    entry = {"source": source, "mtime_ns": mtime_ns, "size": size, "has_deps": bool(deps)}
+    if deps:
+        entry["deps"] = deps
+    _file_cache_used[install_path] = entry
+
+
+def _install_sort_key(install):
+    version = install.get("version")
+    if not isinstance(version, str):
+        return ()
+    key = parse_version_key(version)
+    return () if key is None else _as_tuple_key(key)
+
+
 def get_installed_plugins():
-    """Return dict of plugin_name -> {marketplace, version, install_path}."""
+    """Return dict of plugin_name -> {marketplace, version, install_path}.
+
+    When a plugin has several install records, the highest version wins.
+    """
     data = load_json(INSTALLED_FILE)
     plugins = {}
     for key, installs in data.get("plugins", {}).items():
         # key format: "plugin-name@marketplace-name"
-        if "@" not in key:
+        if "@" not in key or not installs:
             continue
         name, marketplace = key.split("@", 1)
-        for install in installs:
-            path = install.get("installPath", "")
-            version = install.get("version", "")
-            plugins[name] = {
-                "marketplace": marketplace,
-                "version": version,
-                "install_path": path,
-                "scope": install.get("scope", ""),
-                "project_path": install.get("projectPath", ""),
-            }
+        # Keep the highest-versioned install; unparsable versions sort lowest
+        # and ties go to the later record
+        install = max(reversed(installs), key=_install_sort_key)
+        plugins[name] = {
+            "marketplace": marketplace,
+            "version": install.get("version", ""),
+            "install_path": install.get("installPath", ""),
+            "scope": install.get("scope", ""),
+            "project_path": install.get("projectPath", ""),
+        }
     return plugins
 
 
@@ -261,126 +435,261 @@ def get_known_marketplaces():
     return load_json(MARKETPLACES_FILE)
 
 
+@functools.lru_cache(maxsize=None)
 def read_plugin_json(install_path):
-    """Read a plugin's .claude-plugin/plugin.json."""
+    """Read a plugin's .claude-plugin/plugin.json.
+
+    Memoized per install_path so each file is parsed at most once per run.
+    """
     pj = Path(install_path) / ".claude-plugin" / "plugin.json"
     return load_json(pj)
 
 
+@functools.lru_cache(maxsize=None)
 def read_plugin_deps(install_path):
     """Read a plugin's dependencies from .claude-plugin/deps.json.
 
     Falls back to the 'dependencies' key in plugin.json for legacy plugins.
+    Memoized per install_path, like read_plugin_json, and served from the
+    on-disk cache when the declaring file is unchanged.
+    """
+    plugin_dir = Path(install_path) / ".claude-plugin"
+    deps_file = plugin_dir / "deps.json"
+    mtime_ns, size = _file_validator(deps_file)
+    if mtime_ns is not None:
+        source = "deps.json"
+    else:
+        source = "plugin.json"
+        mtime_ns, size = _file_validator(plugin_dir / "plugin.json")
+
+    deps = cached_plugin_deps(install_path, source, mtime_ns, size)
+    if deps is not None:
+        return deps
+
+    if source == "deps.json":
+        deps = load_json(deps_file)
+    else:
+        # Legacy fallback
+        deps = read_plugin_json(install_path).get("dependencies", {})
+    store_plugin_deps(install_path, source, mtime_ns, size, deps)
+    return deps
+
+
+def prefetch_plugin_deps(installed):
+    """Warm the read_plugin_deps cache for all installed plugins concurrently.
+
+    The reads are independent disk I/O, so a thread pool overlaps their
+    latency on cold filesystem caches. Errors are left for the synchronous
+    call in build_graph() to raise.
     """
-    deps_file = Path(install_path) / ".claude-plugin" / "deps.json"
-    if deps_file.exists():
-        return load_json(deps_file)
-    # Legacy fallback
-    pj = read_plugin_json(install_path)
-    return pj.get("dependencies", {})
+    paths = {str(info["install_path"]) for info in installed.values()}
+    if len(paths) < 2:
+        return
+    max_workers = min(32, (os.cpu_count() or 1) * 4, len(paths))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        wait([pool.submit(read_plugin_deps, path) for path in paths])
 
 
 # ---------------------------------------------------------------------------
 # Dependency resolution
 # ---------------------------------------------------------------------------
 
-def resolve(installed, marketplaces):
-    """Walk the dependency tree.
+def _tarjan_scc(graph):
+    """Return the strongly connected components of graph.
 
-    Returns (tree, missing, version_mismatches, cycles, marketplace_cmds, install_cmds, update_cmds).
+    graph maps node -> list of successor nodes; successors that are not keys
+    of graph are ignored. Uses an explicit stack rather than recursion so deep
+    dependency chains don't hit the interpreter recursion limit.
     """
-    tree = {}  # plugin_name -> list of dependency names
-    missing = {}  # dep_name -> {marketplace, source}
-    mismatches = []  # list of {plugin, dependency, installed, constraint, reason}
-    cycles = []  # list of cycle descriptions (e.g., "a -> b -> a")
-    marketplace_cmds = []
-    install_cmds = []
-    update_cmds = []  # /plugin update commands for version mismatches
-
-    resolved = set()
-    in_progress = set()
+    index = {}
+    lowlink = {}
+    on_stack = set()
+    scc_stack = []
+    sccs = []
+
+    def visit(node):
+        index[node] = lowlink[node] = len(index)
+        scc_stack.append(node)
+        on_stack.add(node)
+        work.append((node, iter(graph[node])))
+
+    for root in graph:
+        if root in index:
+            continue
+        work = []
+        visit(root)
+
+        while work:
+            node, successors = work[-1]
+            for succ in successors:
+                if succ not in graph:
+                    continue
+                if succ not in index:
+                    visit(succ)
+                    break
+                if succ in on_stack:
+                    lowlink[node] = min(lowlink[node], index[succ])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    scc = []
+                    while True:
+                        member = scc_stack.pop()
+                        on_stack.discard(member)
+                        scc.append(member)
+                        if member == node:
+                            break
+                    sccs.append(scc)
+
+    return sccs
+
+
+def _cycle_path(graph, scc):
+    """Return a shortest cycle through scc[0] that stays inside the SCC."""
+    start = scc[0]
+    members = set(scc)
+    prev = {start: None}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        for succ in graph[node]:
+            if succ == start:
+                path = [start]
+                while node != start:
+                    path.append(node)
+                    node = prev[node]
+                path.append(start)
+                return path[::-1]
+            if succ in members and succ not in prev:
+                prev[succ] = node
+                queue.append(succ)
+    return [start, start]
+
+
+def build_graph(installed):
+    """Read every installed plugin's dependency declarations in one pass.
+
+    Returns (graph, dep_info_by_edge): graph maps plugin_name -> list of
+    declared dependency names, and dep_info_by_edge maps (plugin, dependency)
+    -> dependency info dict (shorthand string values are normalized to
+    {"marketplace": value}).
+    """
+    graph = {}
+    dep_info_by_edge = {}
+    for name, info in installed.items():
+        deps = read_plugin_deps(str(info["install_path"]))
+        graph[name] = list(deps)
+        for dep_name, dep_info in deps.items():
+            if isinstance(dep_info, str):
+                dep_info = {"marketplace": dep_info}
+            dep_info_by_edge[(name, dep_name)] = dep_info
+    return graph, dep_info_by_edge
 
-    def walk(name, path=None):
-        if path is None:
-            path = []
 
-        if name in resolved:
-            return
-        if name in in_progress:
-            cycle_start = path.index(name)
-            cycle = path[cycle_start:] + [name]
-            cycles.append(" -> ".join(cycle))
-            return
+def analyze_graph(graph, installed, marketplaces, dep_info_by_edge):
+    """Check a dependency graph against installed plugins.
 
-        info = installed.get(name)
-        if not info:
-            return
+    Cycles are found with Tarjan's SCC algorithm; one representative cycle
+    is reported per strongly connected component. Self-dependencies are
+    ignored.
 
-        in_progress.add(name)
+    Returns (missing, version_mismatches, cycles, marketplace_cmds, install_cmds, update_cmds).
+    """
+    installed_graph = {}  # plugin_name -> list of installed dependency names (no self-loops)
+    missing = {}  # dep_name -> {marketplace, source}
+    mismatches = []  # list of {plugin, dependency, installed, constraint, reason}
+    cycles = []  # list of cycle descriptions (e.g., "a -> b -> a")
+    # Command collections are dicts used as insertion-ordered sets
+    marketplace_cmds = {}
+    install_cmds = {}
+    update_cmds = {}  # /plugin update commands for version mismatches
 
-        deps = read_plugin_deps(info["install_path"])
-        tree[name] = list(deps.keys())
+    installed_get = installed.get
 
-        for dep_name, dep_info in deps.items():
-            if isinstance(dep_info, str):
-                dep_info = {"marketplace": dep_info}
+    for name, deps in graph.items():
+        installed_deps = installed_graph[name] = []
 
+        for dep_name in deps:
             if dep_name == name:
                 continue
 
-            if dep_name not in installed:
+            dep_info = dep_info_by_edge[(name, dep_name)]
+            installed_info = installed_get(dep_name)
+
+            if installed_info is None:
                 missing[dep_name] = dep_info
                 mp_name = dep_info.get("marketplace", "")
                 source = dep_info.get("source", "")
 
                 if mp_name and mp_name not in marketplaces:
                     if source:
-                        cmd = f"/plugin marketplace add {source}"
-                        if cmd not in marketplace_cmds:
-                            marketplace_cmds.append(cmd)
+                        marketplace_cmds[f"/plugin marketplace add {source}"] = None
 
                 if mp_name:
-                    cmd = f"/plugin install {dep_name}@{mp_name}"
-                    if cmd not in install_cmds:
-                        install_cmds.append(cmd)
-            else:
-                # Plugin is installed — check version constraint
-                constraint = dep_info.get("version", "")
-                if constraint:
-                    dep_version = installed[dep_name]["version"]
-                    ok, reason = satisfies(dep_version, constraint)
-                    if not ok:
-                        mismatches.append({
-                            "plugin": name,
-                            "dependency": dep_name,
-                            "installed": dep_version,
-                            "constraint": constraint,
-                            "reason": reason,
-                        })
-                        mp_name = installed[dep_name]["marketplace"]
-                        cmd = f"/plugin update {dep_name}@{mp_name}"
-                        if cmd not in update_cmds:
-                            update_cmds.append(cmd)
-
-                walk(dep_name, path + [name])
-
-        in_progress.discard(name)
-        resolved.add(name)
-
-    for name in list(installed.keys()):
-        walk(name)
-
-    return tree, missing, mismatches, cycles, marketplace_cmds, install_cmds, update_cmds
+                    install_cmds[f"/plugin install {dep_name}@{mp_name}"] = None
+                continue
+
+            installed_deps.append(dep_name)
+
+            # Plugin is installed — check version constraint
+            constraint = dep_info.get("version", "")
+            if constraint:
+                dep_version = installed_info["version"]
+                ok, reason = satisfies(dep_version, constraint)
+                if not ok:
+                    mismatches.append({
+                        "plugin": name,
+                        "dependency": dep_name,
+                        "installed": dep_version,
+                        "constraint": constraint,
+                        "reason": reason,
+                    })
+                    mp_name = installed_info["marketplace"]
+                    update_cmds[f"/plugin update {dep_name}@{mp_name}"] = None
+
+    # Report cycles in installed-plugin order for stable output
+    order = {name: i for i, name in enumerate(installed)}
+    components = [
+        sorted(scc, key=order.get) for scc in _tarjan_scc(installed_graph) if len(scc) > 1
+    ]
+    for scc in sorted(components, key=lambda c: order[c[0]]):
+        cycles.append(" -> ".join(_cycle_path(installed_graph, scc)))
+
+    return missing, mismatches, cycles, marketplace_cmds, install_cmds, update_cmds
+
+
+def resolve(installed, marketplaces):
+    """Build the dependency tree and check it against installed plugins.
+
+    Returns (tree, missing, version_mismatches, cycles, marketplace_cmds, install_cmds, update_cmds).
+    """
+    tree, dep_info_by_edge = build_graph(installed)
+    if not any(tree.values()):
+        # Common case: nothing declares dependencies, so nothing to check
+        return tree, {}, [], [], {}, {}, {}
+    return (tree,) + analyze_graph(tree, installed, marketplaces, dep_info_by_edge)
 
 
 # ---------------------------------------------------------------------------
 # Display
 # ---------------------------------------------------------------------------
 
-def print_tree(tree, installed, mismatches=None):
-    """Print a visual dependency tree."""
-    if not any(deps for deps in tree.values()):
-        print("No dependencies declared by any installed plugin.")
+_TREE_MID = "    ├── "
+_TREE_LAST = "    └── "
+
+
+def print_tree(sorted_tree, installed, installed_names, mismatches=None, emit=print):
+    """Print a visual dependency tree.
+
+    sorted_tree is a list of (name, deps) pairs, sorted by name, holding only
+    plugins with at least one dependency; installed_names is
+    frozenset(installed). Each output line is passed to emit.
+    """
+    if not sorted_tree:
+        emit("No dependencies declared by any installed plugin.")
         return
 
     mismatch_set = set()
@@ -388,86 +697,113 @@ def print_tree(tree, installed, mismatches=None):
         for mm in mismatches:
             mismatch_set.add((mm["plugin"], mm["dependency"]))
 
-    print("Dependency tree:")
-    for name, deps in sorted(tree.items()):
-        if deps:
-            status = "installed" if name in installed else "MISSING"
-            print(f"  {name} ({status})")
-            for i, dep in enumerate(deps):
-                prefix = "└── " if i == len(deps) - 1 else "├── "
-                if dep not in installed:
-                    dep_status = "MISSING"
-                elif (name, dep) in mismatch_set:
-                    dep_status = f"v{installed[dep]['version']} OUTDATED"
-                else:
-                    dep_status = f"v{installed[dep]['version']}"
-                print(f"    {prefix}{dep} ({dep_status})")
+    installed_get = installed.get
+
+    emit("Dependency tree:")
+    for name, deps in sorted_tree:
+        status = "installed" if name in installed_names else "MISSING"
+        lines = [f"  {name} ({status})"]
+        last_idx = len(deps) - 1
+        for i, dep in enumerate(deps):
+            prefix = _TREE_LAST if i == last_idx else _TREE_MID
+            dep_info = installed_get(dep)
+            if dep_info is None:
+                dep_status = "MISSING"
+            elif (name, dep) in mismatch_set:
+                dep_status = f"v{dep_info['version']} OUTDATED"
+            else:
+                dep_status = f"v{dep_info['version']}"
+            lines.append(f"{prefix}{dep} ({dep_status})")
+        emit("\n".join(lines))
 
 
 def main():
-    mode = sys.argv[1] if len(sys.argv) > 1 else "resolve"
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    flags = set(sys.argv[1:]) - set(args)
+    mode = args[0] if args else "resolve"
+    use_cache = "--no-cache" not in flags
+    compact = "--compact" in flags  # json mode: no indentation or spaces
+
+    read_plugin_json.cache_clear()
+    read_plugin_deps.cache_clear()
+    if use_cache:
+        load_file_cache()
 
     installed = get_installed_plugins()
+    prefetch_plugin_deps(installed)
     marketplaces = get_known_marketplaces()
     tree, missing, mismatches, cycles, mp_cmds, install_cmds, update_cmds = resolve(
         installed, marketplaces
     )
+    save_file_cache()
+
+    installed_names = frozenset(installed)
+    sorted_tree = sorted((name, deps) for name, deps in tree.items() if deps)
+
+    out = []
+    emit = out.append
 
     if mode == "tree":
-        print_tree(tree, installed, mismatches)
+        print_tree(sorted_tree, installed, installed_names, mismatches, emit)
         if cycles:
-            print(f"\nWarning: {len(cycles)} dependency cycle(s) detected:")
+            emit(f"\nWarning: {len(cycles)} dependency cycle(s) detected:")
             for c in cycles:
-                print(f"  {c}")
-        return
-
-    if mode == "json":
-        print(json.dumps({
+                emit(f"  {c}")
+    elif mode == "json":
+        payload = {
             "installed": {k: v["version"] for k, v in installed.items()},
             "tree": tree,
             "missing": list(missing.keys()),
             "version_mismatches": mismatches,
             "cycles": cycles,
-            "marketplace_commands": mp_cmds,
-            "install_commands": install_cmds,
-            "update_commands": update_cmds,
-        }, indent=2))
-        return
-
-    # Default: resolve mode
-    print(f"Installed plugins: {len(installed)}")
-    for name, info in sorted(installed.items()):
-        print(f"  {name} v{info['version']} ({info['marketplace']})")
-
-    print()
-    print_tree(tree, installed, mismatches)
+            "marketplace_commands": list(mp_cmds),
+            "install_commands": list(install_cmds),
+            "update_commands": list(update_cmds),
+        }
+        if orjson is not None:
+            option = 0 if compact else orjson.OPT_INDENT_2
+            emit(orjson.dumps(payload, option=option).decode())
+        elif compact:
+            emit(json.dumps(payload, separators=(",", ":")))
+        else:
+            emit(json.dumps(payload, indent=2))
+    else:
+        # Default: resolve mode
+        emit(f"Installed plugins: {len(installed)}")
+        for name, info in sorted(installed.items()):
+            emit(f"  {name} v{info['version']} ({info['marketplace']})")
 
-    if cycles:
-        print(f"\nWarning: {len(cycles)} dependency cycle(s) detected:")
-        for c in cycles:
-            print(f"  {c}")
+        emit("")
+        print_tree(sorted_tree, installed, installed_names, mismatches, emit)
 
-    if mismatches:
-        print(f"\nVersion mismatches: {len(mismatches)}")
-        for mm in mismatches:
-            print(f"  {mm['plugin']} requires {mm['dependency']} {mm['constraint']}")
-            print(f"    {mm['reason']}")
-        print("\nUpdate outdated plugins:")
-        for cmd in update_cmds:
-            print(f"  {cmd}")
-
-    if missing:
-        print(f"\nMissing dependencies: {len(missing)}")
-        if mp_cmds:
-            print("\nFirst, add missing marketplaces:")
-            for cmd in mp_cmds:
-                print(f"  {cmd}")
-        print("\nThen install missing plugins:")
-        for cmd in install_cmds:
-            print(f"  {cmd}")
-
-    if not missing and not mismatches:
-        print("\nAll dependencies satisfied.")
+        if cycles:
+            emit(f"\nWarning: {len(cycles)} dependency cycle(s) detected:")
+            for c in cycles:
+                emit(f"  {c}")
+
+        if mismatches:
+            emit(f"\nVersion mismatches: {len(mismatches)}")
+            for mm in mismatches:
+                emit(f"  {mm['plugin']} requires {mm['dependency']} {mm['constraint']}")
+                emit(f"    {mm['reason']}")
+            emit("\nUpdate outdated plugins:")
+            for cmd in update_cmds:
+                emit(f"  {cmd}")
+
+        if missing:
+            emit(f"\nMissing dependencies: {len(missing)}")
+            if mp_cmds:
+                emit("\nFirst, add missing marketplaces:")
+                for cmd in mp_cmds:
+                    emit(f"  {cmd}")
+            emit("\nThen install missing plugins:")
+            for cmd in install_cmds:
+                emit(f"  {cmd}")
+
+        if not missing and not mismatches:
+            emit("\nAll dependencies satisfied.")
+
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 if __name__ == "__main__":